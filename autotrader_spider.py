@@ -1,12 +1,13 @@
-import json
 import os
 import re
+from datetime import datetime
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 import scrapy
 from dotenv import load_dotenv
 from scrapy.crawler import CrawlerProcess
 
+from helpers.configHelper import get_config
 from helpers.dbHelper import DbHelper
 from helpers.telegramHelper import TelegramBotHelper
 
@@ -54,13 +55,7 @@ class AutoTraderSpider(scrapy.Spider):
         'HANDLE_HTTPSTATUS_LIST': [403],
     }
 
-    project_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(project_dir, 'config.json')
-
-    with open(config_path, 'r') as config_file:
-        config = json.load(config_file)
-
-    start_urls = [config['start_url']]
+    start_urls = [get_config().start_url]
     db_helper = DbHelper(os.getenv('DATABASE_NAME'), "listings")
     bot_helper = TelegramBotHelper()
     items = []
@@ -141,6 +136,10 @@ class AutoTraderSpider(scrapy.Spider):
     def closed(self, reason):
         try:
             if reason == "finished":
+                # Stamp the crawl, so the snapshot exporter can tell fresh listings from stale ones
+                crawled_at = datetime.now().replace(microsecond=0)
+                for item in self.items:
+                    item['CrawledAt'] = crawled_at
                 self.db_helper.delete_all()
                 self.db_helper.insert_many(self.items)
                 self.bot_helper.send_log(f"Spider finished. New listings: {len(self.items)}")
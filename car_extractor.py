@@ -1,12 +1,12 @@
 # CarsExtractor.py
 
-import json
 import os
 import re
 import logging
 from dotenv import load_dotenv
 
 from helpers.dbHelper import DbHelper
+from helpers.subscriptionHelper import SubscriptionHelper, union_car_configs
 from helpers.telegramHelper import TelegramBotHelper  # Import your TelegramBotHelper
 
 # Configure logging
@@ -16,25 +16,26 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 class CarsExtractor:
-    def __init__(self):
-        project_dir = os.path.dirname(os.path.abspath(__file__))
-
-        # Load configuration from config.json
-        config_path = os.path.join(project_dir, 'config.json')
-        with open(config_path, 'r') as config_file:
-            config = json.load(config_file)
-
-        # Load multiple car search configurations
-        self.cars_config = config['cars']
-        self.db_helper = DbHelper(os.getenv('DATABASE_NAME'), "listings")
+    def __init__(self, listings_collection="listings", extracted_collection="extracted_cars", bot_helper=None,
+                 subscriptions=None):
+        # Union of the car search configurations of every subscriber, so one
+        # extraction pass serves all of them
+        if subscriptions is None:
+            subscription_helper = SubscriptionHelper()
+            subscriptions = subscription_helper.get_subscriptions()
+            subscription_helper.close_connection()
+        self.cars_config = union_car_configs(subscriptions)
+        self.db_helper = DbHelper(os.getenv('DATABASE_NAME'), listings_collection)
         # Collection for storing extracted cars
-        self.extracted_cars_db = DbHelper(os.getenv('DATABASE_NAME'), "extracted_cars")
+        self.extracted_cars_db = DbHelper(os.getenv('DATABASE_NAME'), extracted_collection)
 
         # Initialize your TelegramBotHelper
-        self.bot_helper = TelegramBotHelper()
+        self.bot_helper = bot_helper or TelegramBotHelper()
 
     def extract_year_from_title(self, title):
         """Extract the first four-digit number in the title (assuming it's the year)."""
+        if not title:
+            return None
         match = re.search(r'\b(19|20)\d{2}\b', title)
         return int(match.group()) if match else None
 
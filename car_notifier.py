@@ -1,4 +1,3 @@
-import json
 import os
 import logging
 import re
@@ -7,7 +6,10 @@ from datetime import datetime
 import sys
 
 from helpers.chatGptDescriptionCheck import ChatGptDescriptionCheck
+from helpers.configHelper import get_config
 from helpers.dbHelper import DbHelper
+from helpers.descriptionPrefilter import DescriptionPrefilter
+from helpers.subscriptionHelper import SubscriptionHelper, car_matches_config
 from helpers.telegramHelper import TelegramBotHelper
 from dotenv import load_dotenv
 
@@ -18,30 +20,69 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 class CarNotifier:
-    def __init__(self):
-        project_dir = os.path.dirname(os.path.abspath(__file__))
+    def __init__(self, extracted_collection="extracted_cars", sent_collection="sent_listings", bot_helper=None,
+                 subscriptions=None, use_prefilter=True, reuse_verdicts=True):
+        # sent_listings records written before subscriptions existed have no ChatId
+        # and belong to the results chat from config.json
+        self.legacy_chat_id = get_config().telegram_chat_id_results
+        self.db_helper = DbHelper(os.getenv('DATABASE_NAME'), extracted_collection)  # Use extracted_cars collection
+        self.sent_db = DbHelper(os.getenv('DATABASE_NAME'), sent_collection)
+        self.bot_helper = bot_helper or TelegramBotHelper()
+        self.send_delay = 1  # Seconds between Telegram messages about cars
 
-        # Load configuration from config.json
-        config_path = os.path.join(project_dir, 'config.json')
-        with open(config_path, 'r') as config_file:
-            config = json.load(config_file)
-
-        # Load multiple car search configurations
-        self.cars_config = config['cars']
-        self.db_helper = DbHelper(os.getenv('DATABASE_NAME'), "extracted_cars")  # Use extracted_cars collection
-        self.sent_db = DbHelper(os.getenv('DATABASE_NAME'), "sent_listings")
-        self.bot_helper = TelegramBotHelper()
+        # Load every subscriber (chat ID + car search configurations), unless given
+        if subscriptions is None:
+            subscription_helper = SubscriptionHelper()
+            subscriptions = subscription_helper.get_subscriptions()
+            subscription_helper.close_connection()
+        self.subscriptions = subscriptions
 
         # Initialize the description checker
         self.description_checker = ChatGptDescriptionCheck()
         logger.info("Description checker initialized.")
 
+        # Local first pass that decides obvious descriptions without calling the LLM
+        self.prefilter = None
+        if use_prefilter:
+            self.prefilter = DescriptionPrefilter()
+            self._train_prefilter()
+
+        # Verdicts per car ID, shared by all subscribers so each description is checked once per run
+        self.verdicts = {}
+        self.verdict_sources = {}  # Car ID -> "prefilter" or "llm"
+        self.reuse_verdicts = reuse_verdicts  # Reuse verdicts stored in sent_listings
+        self.verdict_seconds = 0.0  # Time spent computing verdicts
+
     def extract_year_from_title(self, title):
         """Extract the first four-digit number in the title (assuming it's the year)."""
+        if not title:
+            return None
         match = re.search(r'\b(19|20)\d{2}\b', title)
         return int(match.group()) if match else None
 
     def search_for_cars(self):
+        cars = self.load_cars()
+
+        for subscription in self.subscriptions:
+            self.notify_subscriber(subscription, cars)
+
+        self.report_prefilter()
+
+    def load_cars(self):
+        """Load the extracted cars once, to be matched against every subscriber in memory."""
+        cars = list(self.db_helper.db.find({}))
+        logger.info(f"Loaded {len(cars)} extracted cars for {len(self.subscriptions)} subscriber(s).")
+        return cars
+
+    def report_prefilter(self):
+        """Log the fraction of LLM calls avoided by the prefilter."""
+        if self.prefilter and self.prefilter.total_checked:
+            report = self.prefilter.report()
+            logger.info(report)
+            self.bot_helper.send_log(report)
+
+    def notify_subscriber(self, subscription, cars):
+        chat_id = subscription['chat_id']
         total_inserted_ids = []  # To store all inserted car IDs across all configurations
 
         # Get the current date and time
@@ -53,10 +94,10 @@ class CarNotifier:
         )
 
         # Send the first message with date and time
-        self.bot_helper.send_result("----------------------")
-        self.bot_helper.send_result(date_time_message)
+        self.bot_helper.send_message(chat_id, "----------------------")
+        self.bot_helper.send_message(chat_id, date_time_message)
 
-        for car_config in self.cars_config:
+        for car_config in subscription['cars']:
             # Initialize inserted_ids for this configuration
             inserted_ids = []  # IDs of cars sent for this configuration
 
@@ -76,88 +117,63 @@ class CarNotifier:
             )
 
             # Send the formatted message to Telegram
-            self.bot_helper.send_result(search_message)
+            self.bot_helper.send_message(chat_id, search_message)
 
             # Logging the same search message
-            logger.info(f"Searching for cars: {car_config}")
-
-            # Query the extracted_cars collection
-            new_cars = list(self.db_helper.db.find({
-                "Price": {"$lte": car_config['max_price']},
-                "$or": [
-                    {"Mileage": {"$lte": car_config['max_mileage']}},
-                    {"Mileage": None}
-                ],
-                "Proximity": {"$lte": car_config['max_proximity']},
-                "Title": {"$regex": f".*{car_config['title_contains']}.*", "$options": "i"}
-            }))
-
-            for car in new_cars:
-                title = car['Title']
-                year = self.extract_year_from_title(title)
-
-                # Apply year filter if provided
-                if car_config['min_year'] and year and year < car_config['min_year']:
+            logger.info(f"Searching for cars for chat {chat_id}: {car_config}")
+
+            for car in cars:
+                year = self.extract_year_from_title(car.get('Title'))
+
+                if not car_matches_config(car, car_config, year):
+                    continue
+
+                # Check if the car has already been sent to this subscriber
+                if self._is_sent(car, chat_id):
                     continue
 
-                # Check if the car has already been sent
-                if not self.sent_db.db.find_one({"ID": car["ID"]}):
-                    # Initialize verdict
-                    verdict = ""
-                    status = "Unknown"
-
-                    # If description check is enabled, evaluate the description
-                    if use_description_check:
-                        description = car.get('Description', '')
-                        if description and len(description) >= 3:
-                            try:
-                                result = self.description_checker.check_the_car(description)
-                                if result is True:
-                                    verdict = "✅ Good"
-                                    status = "Good"
-                                else:
-                                    # If car is "bad", record it and skip sending
-                                    verdict = "❌ Bad"
-                                    status = "Bad"
-                                    logger.info(f"Car ID {car['ID']} marked as Bad and saved.")
-                                    self._save_to_sent_db(car, status)  # Save bad cars to the DB
-                                    continue
-                            except Exception as e:
-                                logger.error(f"Error checking description: {e}")
-                                sys.exit(1)  # Exit the script with an error
-                        else:
-                            # Include cars without descriptions and prompt manual check
-                            verdict = "⚠️ No Description"
-                            status = "No Description"
-                            logger.info(f"Car ID {car['ID']} has no valid description.")
-                            self._save_to_sent_db(car, status)  # Save no-description cars to the DB
-
-                    # Prepare the message to send
-                    message = (
-                        f"🎉 *New Car Found* 🎉:\n\n"
-                        f"📝 *Title*: {car['Title']}\n"
-                        f"📅 *Year*: {year if year else 'Unknown'}\n"
-                        f"💰 *Price*: {car['Price']}\n"
-                        f"📏 *Mileage*: {car['Mileage'] if car['Mileage'] else 'Unknown'} km\n"
-                        f"📍 *Proximity*: {car['Proximity']} km\n"
-                        f"🔗 *Link*: [View Car]({car['Product URL']})\n"
-                    )
-
-                    # If description check is enabled, add the verdict to the message
-                    if use_description_check:
-                        message += f"\n🔍 *Description Check*: {verdict}\n"
-
-                    time.sleep(1)
-                    self.bot_helper.send_result(message)
-                    self._save_to_sent_db(car, "Good")  # Save good cars to the DB
-                    inserted_ids.append(car["ID"])  # Add ID to the list
-                    total_inserted_ids.append(car["ID"])  # Add to total list
-                    logger.info(f"Car with ID {car['ID']} sent and saved to sent_listings.")
+                # Initialize verdict
+                verdict = ""
+                status = "Unknown"
+
+                # If description check is enabled, evaluate the description
+                if use_description_check:
+                    verdict, status = self._get_verdict(car)
+                    if status == "Bad":
+                        # If car is "bad", record it and skip sending
+                        logger.info(f"Car ID {car['ID']} marked as Bad and saved for chat {chat_id}.")
+                        self._save_to_sent_db(car, status, chat_id, verdict=status)  # Save bad cars to the DB
+                        continue
+                    if status == "No Description":
+                        self._save_to_sent_db(car, status, chat_id)  # Save no-description cars to the DB
+
+                # Prepare the message to send
+                message = (
+                    f"🎉 *New Car Found* 🎉:\n\n"
+                    f"📝 *Title*: {car['Title']}\n"
+                    f"📅 *Year*: {year if year else 'Unknown'}\n"
+                    f"💰 *Price*: {car['Price']}\n"
+                    f"📏 *Mileage*: {car['Mileage'] if car['Mileage'] else 'Unknown'} km\n"
+                    f"📍 *Proximity*: {car['Proximity']} km\n"
+                    f"🔗 *Link*: [View Car]({car['Product URL']})\n"
+                )
+
+                # If description check is enabled, add the verdict to the message
+                if use_description_check:
+                    message += f"\n🔍 *Description Check*: {verdict}\n"
+
+                time.sleep(self.send_delay)
+                self.bot_helper.send_message(chat_id, message)
+                self._save_to_sent_db(car, "Good", chat_id,
+                                      verdict=status if status == "Good" else None)  # Save good cars to the DB
+                inserted_ids.append(car["ID"])  # Add ID to the list
+                total_inserted_ids.append(car["ID"])  # Add to total list
+                logger.info(f"Car with ID {car['ID']} sent to chat {chat_id} and saved to sent_listings.")
 
             # Log and send the number of cars sent for this configuration
             logger.info(
-                f"Found {len(inserted_ids)} cars for {car_config['title_contains']} that were sent to Telegram.")
-            self.bot_helper.send_result(f"Found {len(inserted_ids)} cars for *{car_config['title_contains'].capitalize()}* 🚗")
+                f"Found {len(inserted_ids)} cars for {car_config['title_contains']} that were sent to chat {chat_id}.")
+            self.bot_helper.send_message(chat_id, f"Found {len(inserted_ids)} cars for *{car_config['title_contains'].capitalize()}* 🚗")
 
         # Send a summary log with the total inserted IDs
         if total_inserted_ids:
@@ -165,16 +181,102 @@ class CarNotifier:
                 f"📝 *Summary*: {len(total_inserted_ids)} cars sent to Telegram.\n"
                 f"🆔 *Sent IDs*: {', '.join(total_inserted_ids)}"
             )
-            self.bot_helper.send_result(summary_message)
-            logger.info(f"Sent {len(total_inserted_ids)} car IDs to Telegram.")
+            self.bot_helper.send_message(chat_id, summary_message)
+            logger.info(f"Sent {len(total_inserted_ids)} car IDs to chat {chat_id}.")
+
+    def _get_verdict(self, car):
+        """
+        Return the (verdict, status) of a car's description.
+
+        The result is computed once per car and shared by every subscriber. A verdict
+        already stored in sent_listings for another subscriber is reused as well, unless
+        it was decided by the prefilter: those are checked again with the current rules.
+        """
+        car_id = car["ID"]
+        if car_id in self.verdicts:
+            return self.verdicts[car_id]
+
+        started = time.perf_counter()
+        description = car.get('Description', '')
+        stored = None
+        if self.reuse_verdicts:
+            stored = self.sent_db.db.find_one(
+                {"ID": car_id, "Verdict": {"$exists": True}, "VerdictSource": {"$ne": "prefilter"}})
+        if stored:
+            status = stored["Verdict"]
+            verdict = "✅ Good" if status == "Good" else "❌ Bad"
+            source = stored.get("VerdictSource", "llm")
+        elif description and len(description) >= 3:
+            # Obvious descriptions are decided locally, ambiguous ones go to the LLM
+            result = self.prefilter.classify(description) if self.prefilter else None
+            source = "prefilter"
+            if result is None:
+                source = "llm"
+                try:
+                    result = self.description_checker.check_the_car(description)
+                except Exception as e:
+                    logger.error(f"Error checking description: {e}")
+                    sys.exit(1)  # Exit the script with an error
+            if result is True:
+                verdict = "✅ Good"
+                status = "Good"
+            else:
+                verdict = "❌ Bad"
+                status = "Bad"
+        else:
+            # Include cars without descriptions and prompt manual check
+            verdict = "⚠️ No Description"
+            status = "No Description"
+            source = None
+            logger.info(f"Car ID {car_id} has no valid description.")
+
+        self.verdict_sources[car_id] = source
+        self.verdicts[car_id] = (verdict, status)
+        self.verdict_seconds += time.perf_counter() - started
+        return verdict, status
+
+    def _train_prefilter(self):
+        """Train the prefilter model on the LLM verdicts stored in the production sent_listings."""
+        descriptions = []
+        verdicts = []
+        seen_ids = set()
+        training_db = DbHelper(os.getenv('DATABASE_NAME'), "sent_listings")
+        for record in training_db.db.find({
+            "Verdict": {"$in": ["Good", "Bad"]},
+            "VerdictSource": "llm",
+            "Description": {"$nin": [None, ""]}
+        }):
+            # The same car may be stored once per subscriber
+            if record["ID"] in seen_ids:
+                continue
+            seen_ids.add(record["ID"])
+            descriptions.append(record["Description"])
+            verdicts.append(record["Verdict"] == "Good")
+        training_db.close_connection()
+
+        self.prefilter.train(descriptions, verdicts)
+
+    def _is_sent(self, car, chat_id):
+        """Check if the car has already been recorded in sent_listings for this chat."""
+        chat_filter = [{"ChatId": chat_id}]
+        if chat_id == self.legacy_chat_id:
+            chat_filter.append({"ChatId": {"$exists": False}})
+        return self.sent_db.db.find_one({"ID": car["ID"], "$or": chat_filter}) is not None
 
-    def _save_to_sent_db(self, car, status):
+    def _save_to_sent_db(self, car, status, chat_id, verdict=None):
         """Save the car information to the sent_listings collection with the status."""
-        self.sent_db.db.insert_one({
+        record = {
             "ID": car["ID"],
+            "ChatId": chat_id,
             "SentDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Status": status
-        })
+        }
+        if verdict:
+            # Description check result, reused for other subscribers and to train the prefilter
+            record["Verdict"] = verdict
+            record["VerdictSource"] = self.verdict_sources.get(car["ID"])
+            record["Description"] = car.get('Description', '')
+        self.sent_db.db.insert_one(record)
 
     def close_connections(self):
         """Close database connections."""
@@ -0,0 +1,187 @@
+# helpers/configHelper.py
+
+import json
+import os
+import re
+import logging
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.json')
+
+# pipeline.py points its stages at a frozen copy of the config validated at the start of the run
+CONFIG_PATH_ENV = 'CARS_CONFIG_PATH'
+CONFIG_PATH = os.getenv(CONFIG_PATH_ENV, DEFAULT_CONFIG_PATH)
+
+
+class ConfigError(ValueError):
+    """Raised when config.json (or a car search stored elsewhere) is invalid."""
+
+
+@dataclass(frozen=True)
+class CarSearch:
+    max_price: float
+    max_mileage: int
+    max_proximity: int
+    title_contains: str
+    min_year: Optional[int] = None
+    use_description_check: bool = False
+
+    def as_dict(self):
+        """Plain dict in the format used by config.json, the subscriptions and the extractor."""
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class Config:
+    cars: tuple
+    start_url: str
+    telegram_chat_id_logging: str
+    telegram_chat_id_results: str
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# Fields of a car search: (check, description of the expected type, required)
+CAR_SEARCH_FIELDS = {
+    'max_price': (_is_number, "a number", True),
+    'max_mileage': (_is_int, "an integer", True),
+    'max_proximity': (_is_int, "an integer", True),
+    'title_contains': (lambda value: isinstance(value, str) and value != "", "a non-empty string", True),
+    'min_year': (lambda value: value is None or _is_int(value), "an integer or null", False),
+    'use_description_check': (lambda value: isinstance(value, bool), "true or false", False),
+}
+
+
+def _car_search_errors(car, location):
+    if not isinstance(car, dict):
+        return [f"{location}: expected an object, got {car!r}"]
+
+    errors = []
+    for key in car:
+        if key not in CAR_SEARCH_FIELDS:
+            errors.append(f"{location}: unknown field '{key}'")
+    for key, (check, expected, required) in CAR_SEARCH_FIELDS.items():
+        if key not in car:
+            if required:
+                errors.append(f"{location}.{key}: missing")
+        elif not check(car[key]):
+            errors.append(f"{location}.{key}: expected {expected}, got {car[key]!r}")
+
+    # title_contains is used as a regular expression
+    if isinstance(car.get('title_contains'), str):
+        try:
+            re.compile(car['title_contains'])
+        except re.error as e:
+            errors.append(f"{location}.title_contains: invalid regular expression ({e})")
+    return errors
+
+
+def parse_car_searches(cars, location="cars"):
+    """Validate a list of car searches and return them as a tuple of CarSearch."""
+    if not isinstance(cars, list) or not cars:
+        raise ConfigError(f"{location}: expected a non-empty list of car searches")
+
+    errors = []
+    for index, car in enumerate(cars):
+        errors.extend(_car_search_errors(car, f"{location}[{index}]"))
+    if errors:
+        raise ConfigError("\n".join(errors))
+
+    return tuple(CarSearch(**car) for car in cars)
+
+
+def parse_config(data):
+    """Validate the parsed content of config.json and return a Config."""
+    if not isinstance(data, dict):
+        raise ConfigError("config.json: expected an object")
+
+    errors = []
+    cars = ()
+    try:
+        cars = parse_car_searches(data.get('cars'))
+    except ConfigError as e:
+        errors.append(str(e))
+
+    start_url = data.get('start_url')
+    if not isinstance(start_url, str) or not start_url.startswith(('http://', 'https://')):
+        errors.append(f"start_url: expected an http(s) URL, got {start_url!r}")
+
+    for key in ('telegram_chat_id_logging', 'telegram_chat_id_results'):
+        value = data.get(key)
+        if not (isinstance(value, str) and value) and not _is_int(value):
+            errors.append(f"{key}: expected a chat ID, got {value!r}")
+
+    for key in data:
+        if key not in ('cars', 'start_url', 'telegram_chat_id_logging', 'telegram_chat_id_results'):
+            errors.append(f"unknown field '{key}'")
+
+    if errors:
+        raise ConfigError("Invalid config.json:\n" + "\n".join(errors))
+
+    return Config(
+        cars=cars,
+        start_url=start_url,
+        telegram_chat_id_logging=str(data['telegram_chat_id_logging']),
+        telegram_chat_id_results=str(data['telegram_chat_id_results']),
+    )
+
+
+def parse_config_text(text):
+    """Validate the JSON text of a config file and return a Config."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"Invalid config.json: {e}")
+    return parse_config(data)
+
+
+def load_config(path=CONFIG_PATH):
+    """Read and validate a config file. Raises ConfigError if it is invalid."""
+    with open(path, 'r') as config_file:
+        return parse_config_text(config_file.read())
+
+
+# Parsed config of the file get_config() reads, loaded on first use
+_config_path = CONFIG_PATH
+_config = None
+
+
+def get_config():
+    """
+    Return the validated config, parsed once per process and cached.
+
+    Each pipeline run starts the scripts with a frozen copy of config.json, so an edit
+    takes effect from the next run. Raises ConfigError if the file is invalid.
+    """
+    global _config
+    if _config is None:
+        _config = load_config(_config_path)
+    return _config
+
+
+def use_config_file(path):
+    """Read the configuration from another file from now on, e.g. to try new rules in a replay."""
+    global _config_path, _config
+    _config_path = path
+    _config = None
+    return get_config()
+
+
+if __name__ == '__main__':
+    # Validate config.json without running anything
+    try:
+        config = load_config()
+    except ConfigError as e:
+        print(e)
+        raise SystemExit(1)
+    print(f"config.json is valid: {len(config.cars)} car search(es).")
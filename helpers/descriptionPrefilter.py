@@ -0,0 +1,228 @@
+# helpers/descriptionPrefilter.py
+
+import re
+import logging
+
+# scikit-learn is optional: without it only the keyword scorer is used
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+    from sklearn.pipeline import make_pipeline
+except ImportError:
+    make_pipeline = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Phrases that describe a car that is not ready to drive, with their weight and whether
+# the phrase alone is unambiguous enough to decide Bad (decisive)
+BAD_PATTERNS = [
+    (r"\b(engine|motor) (is )?(blown|seized|knocking|dead)\b", 3, False),
+    (r"\bblown (engine|motor|head gasket)\b", 3, False),
+    (r"\b(sold|selling) as[- ]is\b|\bas-is\b|\bas[- ]is condition\b", 3, True),
+    (r"\bparts only\b|\bfor parts\b", 3, True),
+    (r"\b(not|non)[- ]?running\b|\b(does ?n[o']t|won'?t) (start|run|drive)\b", 3, True),
+    (r"\bneeds? (a )?(new )?(engine|motor|transmission|tranny)\b", 3, False),
+    (r"\btransmission (problems?|issues?|slip(s|ping)?)\b|\bslipping transmission\b", 2, False),
+    (r"\bsalvage title\b|\bflood damaged?\b", 3, True),
+    (r"\b(rebuilt|branded) title\b", 3, False),
+    (r"\bmechanic'?s special\b|\bproject car\b|\btow (it )?away\b", 3, False),
+    (r"\bneeds? (some )?work\b|\bneeds? repairs?\b", 2, False),
+    (r"\bneeds? (replacing|replacement|fixing|to be (replaced|fixed))\b", 2, False),
+    (r"\bneeds? (\w+ )?(and )?(safety|brakes|e-?test)\b", 2, False),
+    (r"\b(not|without|no) (safety|certified|certification|e-?test)\b", 2, False),
+    (r"\b(oil|coolant) leak(s|ing)?\b", 1, False),
+    (r"\bcheck engine light\b", 1, False),
+    (r"\brust(ed|y)? (through|holes?)\b|\bframe (rust|damage)\b", 2, False),
+]
+
+# Bad decided locally with one decisive phrase, or with this many different bad phrases
+BAD_PHRASES_TO_DECIDE = 2
+
+# A bad phrase with one of these words nearby in the same sentence describes a past problem
+REPAIR = re.compile(r"\b(repaired|fixed|replaced|restored|previously|rebuilt engine)\b", re.IGNORECASE)
+REPAIR_WINDOW = 6  # Words before and after the phrase
+
+# Dealer boilerplate and phrases describing a car in good, certified condition, with
+# their weight and whether the phrase speaks to roadworthiness on its own (strong)
+GOOD_PATTERNS = [
+    (r"\bsafety (certificate|certified|inspection)( included)?\b|\bcomes certified\b", 2, True),
+    (r"\bcertified pre[- ]owned\b", 2, True),
+    (r"\bready to drive\b|\bruns and drives (great|well|perfect)\b|\bno (mechanical )?issues\b", 2, True),
+    (r"\bclean carfax\b|\bcarfax (report )?(available|included|provided)\b", 1, False),
+    (r"\baccident[- ]free\b|\bno accidents\b", 1, False),
+    (r"\bone owner\b|\bwell[- ]maintained\b|\bservice records?\b", 1, False),
+    (r"\bwarranty\b|\bfinancing (is )?available\b|\bomvic\b|\bucda\b", 1, False),
+]
+
+# A phrase preceded by one of these words in the same clause is ignored ("not safety certified")
+NEGATION = re.compile(r"\b(not|no|never|without)\b|n't\b", re.IGNORECASE)
+NEGATION_WINDOW = 3  # Words before the phrase
+
+# Score needed for the keyword scorer to decide Good without the LLM
+GOOD_THRESHOLD = 3
+
+
+class DescriptionPrefilter:
+    """
+    Fast local first pass in front of ChatGptDescriptionCheck.
+
+    A keyword scorer decides descriptions that are plainly bad or plainly good; Good is
+    only decided locally when a strong roadworthiness phrase matches. When
+    scikit-learn is installed and enough verdicts are stored, a small text model trained
+    on them decides confident cases too, but only if its confident predictions agreed with
+    the LLM on held-out verdicts. Everything else is left to the LLM.
+    """
+
+    def __init__(self, model_confidence=0.9, min_training_samples=50, min_agreement=0.95, folds=5):
+        self.bad_patterns = [(re.compile(pattern, re.IGNORECASE), weight, decisive)
+                             for pattern, weight, decisive in BAD_PATTERNS]
+        self.good_patterns = [(re.compile(pattern, re.IGNORECASE), weight, strong)
+                              for pattern, weight, strong in GOOD_PATTERNS]
+        self.model_confidence = model_confidence
+        self.min_training_samples = min_training_samples
+        self.min_agreement = min_agreement
+        self.folds = folds
+        self.model = None
+        self.model_agreement = None  # Held-out agreement of confident predictions with the LLM
+
+        # Counters for the run report
+        self.total_checked = 0
+        self.decided_by_keywords = 0
+        self.decided_by_model = 0
+
+    def _is_negated(self, description, start):
+        """Check for a negation in the few words before `start`, within the same clause."""
+        clause = re.split(r"[.,;:!?\n]", description[:start])[-1]
+        return bool(NEGATION.search(" ".join(clause.split()[-NEGATION_WINDOW:])))
+
+    def _is_repaired(self, description, match):
+        """Check for a repair word a few words around the match, within the same sentence."""
+        before = re.split(r"[.;!?\n]", description[:match.start()])[-1].split()[-REPAIR_WINDOW:]
+        after = re.split(r"[.;!?\n]", description[match.end():])[0].split()[:REPAIR_WINDOW]
+        return bool(REPAIR.search(" ".join(before + after)))
+
+    def _matches(self, pattern, description):
+        """Check if the pattern matches somewhere without a negation in front of it."""
+        return any(not self._is_negated(description, match.start()) for match in pattern.finditer(description))
+
+    def _matches_bad(self, pattern, description):
+        """Check if a bad pattern matches somewhere, neither negated nor described as repaired."""
+        return any(
+            not self._is_negated(description, match.start()) and not self._is_repaired(description, match)
+            for match in pattern.finditer(description)
+        )
+
+    def bad_phrases(self, description):
+        """Return the (weight, decisive) of every bad pattern matching the description."""
+        return [(weight, decisive) for pattern, weight, decisive in self.bad_patterns
+                if self._matches_bad(pattern, description)]
+
+    def score(self, description):
+        """Return the (bad, good) keyword scores of a description, ignoring negated or repaired phrases."""
+        bad_score = sum(weight for weight, _ in self.bad_phrases(description))
+        good_score = sum(weight for pattern, weight, _ in self.good_patterns if self._matches(pattern, description))
+        return bad_score, good_score
+
+    def has_strong_good(self, description):
+        """Check if a strong good phrase matches without a negation."""
+        return any(strong and self._matches(pattern, description) for pattern, _, strong in self.good_patterns)
+
+    def train(self, descriptions, verdicts):
+        """
+        Train the optional text model on stored descriptions and their LLM verdicts
+        (True for good, False for bad). Does nothing without scikit-learn or enough data.
+        """
+        if make_pipeline is None:
+            logger.info("scikit-learn not installed, using keyword prefilter only.")
+            return
+        if len(descriptions) < self.min_training_samples or len(set(verdicts)) < 2:
+            logger.info(f"Not enough stored verdicts to train the prefilter model ({len(descriptions)}).")
+            return
+
+        folds = min(self.folds, verdicts.count(True), verdicts.count(False))
+        if folds < 2:
+            logger.info("Not enough verdicts of each kind to validate the prefilter model.")
+            return
+
+        # Cross-validate: how often did the predictions confident enough to skip the LLM agree with it?
+        model = self._new_model()
+        probabilities = cross_val_predict(
+            model, descriptions, verdicts, method='predict_proba',
+            cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+        )
+        good_column = sorted(set(verdicts)).index(True)
+        confident = [(probability[good_column] >= 0.5, verdict)
+                     for probability, verdict in zip(probabilities, verdicts)
+                     if max(probability[good_column], 1 - probability[good_column]) >= self.model_confidence]
+        if not confident:
+            logger.info("Prefilter model is never confident on held-out verdicts, not using it.")
+            return
+
+        self.model_agreement = sum(predicted == verdict for predicted, verdict in confident) / len(confident)
+        logger.info(
+            f"Prefilter model held-out agreement with the LLM: {self.model_agreement:.1%} "
+            f"on {len(confident)} of {len(verdicts)} confident verdicts."
+        )
+        if self.model_agreement < self.min_agreement:
+            logger.info(f"Agreement below {self.min_agreement:.0%}, not using the prefilter model.")
+            return
+
+        model.fit(descriptions, verdicts)
+        self.model = model
+        logger.info(f"Prefilter model trained on {len(descriptions)} stored verdicts.")
+
+    def _new_model(self):
+        return make_pipeline(
+            TfidfVectorizer(ngram_range=(1, 2), min_df=2, sublinear_tf=True),
+            LogisticRegression(max_iter=1000, class_weight='balanced')
+        )
+
+    def classify(self, description):
+        """
+        Return True (good) or False (bad) when the description can be decided locally,
+        or None when it is ambiguous and should go to the LLM.
+        """
+        self.total_checked += 1
+
+        bad_phrases = self.bad_phrases(description)
+        bad_score, good_score = self.score(description)
+        decisive = any(decisive for _, decisive in bad_phrases)
+        if good_score == 0 and (decisive or len(bad_phrases) >= BAD_PHRASES_TO_DECIDE):
+            self.decided_by_keywords += 1
+            return False
+        if good_score >= GOOD_THRESHOLD and bad_score == 0 and self.has_strong_good(description):
+            self.decided_by_keywords += 1
+            return True
+
+        if self.model is not None:
+            probabilities = dict(zip(self.model.classes_, self.model.predict_proba([description])[0]))
+            good_probability = probabilities.get(True, 0.0)
+            if good_probability >= self.model_confidence:
+                self.decided_by_model += 1
+                return True
+            if good_probability <= 1 - self.model_confidence:
+                self.decided_by_model += 1
+                return False
+
+        return None
+
+    def avoided_ratio(self):
+        """Fraction of checked descriptions that did not need an LLM call."""
+        if not self.total_checked:
+            return 0.0
+        return (self.decided_by_keywords + self.decided_by_model) / self.total_checked
+
+    def report(self):
+        """Human readable summary of the LLM calls avoided."""
+        avoided = self.decided_by_keywords + self.decided_by_model
+        if self.model is not None:
+            model = f"model: {self.decided_by_model}, held-out agreement {self.model_agreement:.0%}"
+        else:
+            model = "model: not used"
+        return (
+            f"Description prefilter decided {avoided} of {self.total_checked} descriptions locally "
+            f"({self.avoided_ratio():.0%} of LLM calls avoided; "
+            f"keywords: {self.decided_by_keywords}, {model})."
+        )
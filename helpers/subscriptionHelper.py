@@ -0,0 +1,163 @@
+# helpers/subscriptionHelper.py
+
+import argparse
+import json
+import os
+import re
+import logging
+from datetime import datetime
+from dotenv import load_dotenv
+
+from helpers.configHelper import ConfigError, get_config, parse_car_searches
+from helpers.dbHelper import DbHelper
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def car_matches_config(car, car_config, year):
+    """
+    Check a listing against one search configuration.
+
+    Mirrors the Mongo query used by CarsExtractor, so a single load of the
+    extracted cars can be matched against every subscriber in memory.
+    """
+    price = car.get('Price')
+    if price is None or price > car_config['max_price']:
+        return False
+
+    mileage = car.get('Mileage')
+    if mileage is not None and mileage > car_config['max_mileage']:
+        return False
+
+    proximity = car.get('Proximity')
+    if proximity is None or proximity > car_config['max_proximity']:
+        return False
+
+    # Mongo's $regex never matches a missing title, even with a pattern that matches ''
+    title = car.get('Title')
+    if title is None or not re.search(car_config['title_contains'], title, re.IGNORECASE):
+        return False
+
+    # Apply year filter if provided
+    if car_config['min_year'] and year and year < car_config['min_year']:
+        return False
+
+    return True
+
+
+def subscription_from_config(config):
+    """Single subscription made of the results chat and the car searches of a Config."""
+    return {
+        "chat_id": config.telegram_chat_id_results,
+        "name": "default",
+        "cars": [car.as_dict() for car in config.cars],
+    }
+
+
+def union_car_configs(subscriptions):
+    """Return the union of the search configurations of the subscriptions, without duplicates."""
+    car_configs = []
+    seen = set()
+    for subscription in subscriptions:
+        for car_config in subscription['cars']:
+            key = json.dumps(car_config, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                car_configs.append(car_config)
+    return car_configs
+
+
+class SubscriptionHelper:
+    """
+    Subscriptions (a Telegram chat ID plus its own list of car searches) stored in Mongo.
+
+    When the subscriptions collection is empty, the `telegram_chat_id_results` and
+    `cars` entries from config.json are used as a single default subscription.
+    """
+
+    def __init__(self):
+        self.db_helper = DbHelper(os.getenv('DATABASE_NAME'), "subscriptions")
+
+    def get_default_subscription(self):
+        return subscription_from_config(get_config())
+
+    def get_subscriptions(self):
+        """Return all active, valid subscriptions, falling back to the config.json one."""
+        subscriptions = []
+        for subscription in self.db_helper.db.find({"active": {"$ne": False}}):
+            try:
+                cars = parse_car_searches(subscription.get('cars'), f"subscription {subscription.get('chat_id')}")
+            except ConfigError as e:
+                logger.error(f"Skipping invalid subscription:\n{e}")
+                continue
+            subscription['chat_id'] = str(subscription['chat_id'])
+            subscription['cars'] = [car.as_dict() for car in cars]
+            subscriptions.append(subscription)
+
+        if not subscriptions:
+            logger.info("No subscriptions in the database, using config.json settings.")
+            return [self.get_default_subscription()]
+
+        logger.info(f"Loaded {len(subscriptions)} subscriptions.")
+        return subscriptions
+
+    def add_subscription(self, chat_id, cars, name=None):
+        """Create or replace the subscription of a chat. Raises ConfigError if the searches are invalid."""
+        cars = [car.as_dict() for car in parse_car_searches(cars)]
+        self.db_helper.db.update_one(
+            {"chat_id": chat_id},
+            {"$set": {
+                "chat_id": chat_id,
+                "name": name or chat_id,
+                "cars": cars,
+                "active": True,
+                "UpdatedDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }},
+            upsert=True
+        )
+        logger.info(f"Saved subscription for chat {chat_id} with {len(cars)} search(es).")
+
+    def remove_subscription(self, chat_id):
+        """Delete the subscription of a chat."""
+        result = self.db_helper.db.delete_one({"chat_id": chat_id})
+        logger.info(f"Removed {result.deleted_count} subscription(s) for chat {chat_id}.")
+
+    def close_connection(self):
+        self.db_helper.close_connection()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Manage Telegram subscriptions.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = subparsers.add_parser('add', help="Add or replace a subscription.")
+    add_parser.add_argument('chat_id', help="Telegram chat ID to send results to.")
+    add_parser.add_argument('rules', help="Path to a JSON file with a list of car searches (same format as 'cars' in config.json).")
+    add_parser.add_argument('--name', help="Human readable name of the subscriber.")
+
+    remove_parser = subparsers.add_parser('remove', help="Remove a subscription.")
+    remove_parser.add_argument('chat_id')
+
+    subparsers.add_parser('list', help="List active subscriptions.")
+
+    args = parser.parse_args()
+    helper = SubscriptionHelper()
+    try:
+        if args.command == 'add':
+            with open(args.rules, 'r') as rules_file:
+                cars = json.load(rules_file)
+            try:
+                helper.add_subscription(args.chat_id, cars, args.name)
+            except ConfigError as e:
+                print(e)
+                raise SystemExit(1)
+        elif args.command == 'remove':
+            helper.remove_subscription(args.chat_id)
+        elif args.command == 'list':
+            for subscription in helper.get_subscriptions():
+                print(f"{subscription['chat_id']} ({subscription.get('name')}): {len(subscription['cars'])} search(es)")
+    finally:
+        helper.close_connection()
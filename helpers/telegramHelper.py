@@ -1,18 +1,22 @@
 import os
 import requests
-import json
+
+from helpers.configHelper import get_config
 
 class TelegramBotHelper:
 
     def __init__(self):
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        config_path = os.path.join(project_root, 'config.json')
-        with open(config_path, 'r') as config_file:
-            config = json.load(config_file)
-        self.logging_chat_id = config['telegram_chat_id_logging']
-        self.results_chat_id = config['telegram_chat_id_results']
         self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')  # Still use .env for the token
 
+    @property
+    def logging_chat_id(self):
+        # Read from the config on use, so a replay's use_config_file() is honoured
+        return get_config().telegram_chat_id_logging
+
+    @property
+    def results_chat_id(self):
+        return get_config().telegram_chat_id_results
+
     def send_message(self, chat_id, message):
         url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
         data = {
@@ -30,3 +34,19 @@ class TelegramBotHelper:
     def send_result(self, message):
         """Send a result message to the results chat."""
         self.send_message(self.results_chat_id, message)
+
+
+class FileBotHelper(TelegramBotHelper):
+    """Writes messages to a file instead of sending them, for dry runs."""
+
+    def __init__(self, output_path):
+        super().__init__()
+        self.output_path = output_path
+        self.messages_per_chat = {}
+        # Start with an empty file for every run
+        open(self.output_path, 'w').close()
+
+    def send_message(self, chat_id, message):
+        self.messages_per_chat[chat_id] = self.messages_per_chat.get(chat_id, 0) + 1
+        with open(self.output_path, 'a') as output_file:
+            output_file.write(f"--- chat {chat_id} ---\n{message}\n\n")
@@ -1,7 +1,12 @@
+import argparse
 import subprocess
 import sys
 import logging
 import os
+import tempfile
+import time
+
+from helpers.configHelper import CONFIG_PATH_ENV, DEFAULT_CONFIG_PATH, ConfigError, parse_config_text
 
 # Configure logging
 logging.basicConfig(
@@ -10,31 +15,90 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_script(script_name):
+# Scripts whose failure is only a warning: the rest of the run (and the alerts) still goes ahead
+OPTIONAL_SCRIPTS = {'snapshot_exporter.py'}
+
+def run_script(script_name, config_path):
     """
-    Runs a Python script and checks for errors.
+    Runs a Python script with the given config file and checks for errors.
+    Returns False if the script failed.
     """
     logger.info(f"Starting script: {script_name}")
     try:
         # Remove stdout and stderr parameters to allow default behavior
-        result = subprocess.run(
+        subprocess.run(
             [sys.executable, script_name],
             check=True,
-            text=True
+            text=True,
+            env=dict(os.environ, **{CONFIG_PATH_ENV: config_path})
         )
         logger.info(f"Completed script: {script_name}")
+        return True
     except subprocess.CalledProcessError as e:
         logger.error(f"Error executing {script_name}: {e}")
-        sys.exit(1)  # Exit the pipeline if a script fails
+        return False
+
+def freeze_config():
+    """
+    Validate config.json before anything runs, so a typo fails fast instead of
+    as a KeyError after the crawl has already paid its cost.
+
+    The validated content is copied to a file used by every script of the run, so an
+    edit made while the run is in progress cannot break its later stages. Returns the
+    path of that file, or None if config.json is invalid.
+    """
+    try:
+        with open(DEFAULT_CONFIG_PATH, 'r') as config_file:
+            text = config_file.read()
+        config = parse_config_text(text)
+    except (OSError, ConfigError) as e:
+        logger.error(e)
+        return None
+    logger.info(f"config.json is valid: {len(config.cars)} car search(es).")
+
+    descriptor, path = tempfile.mkstemp(prefix='config-run-', suffix='.json')
+    with os.fdopen(descriptor, 'w') as frozen_file:
+        frozen_file.write(text)
+    return path
+
+def run_pipeline(scripts):
+    """Run the scripts in order with a frozen config. Returns False if the run failed."""
+    config_path = freeze_config()
+    if config_path is None:
+        return False
+    try:
+        for script in scripts:
+            if not run_script(script, config_path):
+                if os.path.basename(script) in OPTIONAL_SCRIPTS:
+                    logger.warning(f"{script} failed, continuing the run without it.")
+                    continue
+                return False
+        return True
+    finally:
+        os.remove(config_path)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the full scraping and notification pipeline.")
+    parser.add_argument('--every', type=float,
+                        help="Keep running and start the pipeline every N minutes. "
+                             "config.json is re-read before each run.")
+    args = parser.parse_args()
+
     # List of scripts to run in order
     scripts = [
         'autotrader_spider.py',       # Script 1: Scraper for all cars
-        'car_extractor.py',           # Script 2: Extract cars
-        'extract_description_spider.py', # Script 3: Scrape descriptions
-        'car_notifier.py'             # Script 4: Notify users
+        'snapshot_exporter.py',       # Script 2: Export the crawl as a Parquet snapshot (optional)
+        'car_extractor.py',           # Script 3: Extract cars
+        'extract_description_spider.py', # Script 4: Scrape descriptions
+        'car_notifier.py'             # Script 5: Notify users
     ]
 
-    for script in scripts:
-        run_script(script)
+    if not args.every:
+        sys.exit(0 if run_pipeline(scripts) else 1)
+
+    while True:
+        started = time.monotonic()
+        # A failed stage or an invalid config only skips the rest of this run
+        if not run_pipeline(scripts):
+            logger.error("Run failed, trying again at the next scheduled run.")
+        time.sleep(max(0, args.every * 60 - (time.monotonic() - started)))
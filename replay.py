@@ -0,0 +1,194 @@
+# replay.py
+
+import argparse
+import glob
+import os
+import time
+import logging
+from dotenv import load_dotenv
+
+import pyarrow.parquet as pq
+
+from car_extractor import CarsExtractor
+from car_notifier import CarNotifier
+from helpers.configHelper import ConfigError, use_config_file
+from helpers.dbHelper import DbHelper
+from helpers.subscriptionHelper import subscription_from_config
+from helpers.telegramHelper import FileBotHelper
+from snapshot_exporter import get_snapshot_dir
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Scratch collections, so a replay never touches the production ones
+REPLAY_LISTINGS = "replay_listings"
+REPLAY_EXTRACTED_CARS = "replay_extracted_cars"
+REPLAY_SENT_LISTINGS = "replay_sent_listings"
+
+# Columns of a snapshot that also exist in the listings collection
+LISTING_COLUMNS = ["ID", "Title", "Price", "Mileage", "Proximity", "Product URL"]
+
+
+def latest_snapshot():
+    """Path of the most recent Parquet snapshot, or None."""
+    paths = glob.glob(os.path.join(get_snapshot_dir(), "date=*", "*.parquet"))
+    return max(paths) if paths else None
+
+
+class Replay:
+    """
+    Re-runs CarsExtractor, the description check and CarNotifier against stored listings,
+    without crawling. Telegram messages are written to a file and each stage is timed.
+    """
+
+    def __init__(self, output_path, fresh=False, prompt_path=None, subscriptions=None, use_prefilter=True):
+        self.db_name = os.getenv('DATABASE_NAME')
+        self.bot_helper = FileBotHelper(output_path)
+        self.fresh = fresh
+        self.prompt_path = prompt_path
+        # None replays the subscriptions stored in Mongo
+        self.subscriptions = subscriptions
+        self.use_prefilter = use_prefilter
+        self.timings = []
+        # Matched cars the description check could not judge, because no description was stored
+        self.without_description = 0
+
+    def timed(self, stage, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        self.timings.append((stage, time.perf_counter() - started))
+        return result
+
+    def load_listings(self, snapshot_path=None):
+        """Read the listings from a Parquet snapshot, or from the listings collection if no path is given."""
+        if snapshot_path:
+            logger.info(f"Replaying snapshot {snapshot_path}")
+            listings = pq.read_table(snapshot_path, columns=LISTING_COLUMNS).to_pylist()
+        else:
+            logger.info("Replaying the current listings collection.")
+            listings_db = DbHelper(self.db_name, "listings")
+            listings = list(listings_db.db.find({}, {"_id": 0}))
+            listings_db.close_connection()
+
+        # Descriptions are not part of the listings, reuse the ones already scraped
+        descriptions = {}
+        for collection, query in (
+            ("sent_listings", {"Description": {"$nin": [None, ""]}}),
+            ("extracted_cars", {"Description": {"$exists": True}}),
+        ):
+            source_db = DbHelper(self.db_name, collection)
+            for document in source_db.db.find(query, {"ID": 1, "Description": 1}):
+                descriptions[document["ID"]] = document["Description"]
+            source_db.close_connection()
+
+        for listing in listings:
+            if listing["ID"] in descriptions:
+                listing["Description"] = descriptions[listing["ID"]]
+        logger.info(f"Loaded {len(listings)} listings, {len(descriptions)} stored descriptions.")
+        return listings
+
+    def prepare_collections(self, listings):
+        """Fill the scratch collections: the listings, and the production sent_listings unless fresh."""
+        replay_listings_db = DbHelper(self.db_name, REPLAY_LISTINGS)
+        replay_listings_db.delete_all()
+        if listings:
+            replay_listings_db.insert_many(listings)
+        replay_listings_db.close_connection()
+
+        replay_sent_db = DbHelper(self.db_name, REPLAY_SENT_LISTINGS)
+        replay_sent_db.delete_all()
+        if not self.fresh:
+            sent_db = DbHelper(self.db_name, "sent_listings")
+            sent = list(sent_db.db.find({}, {"_id": 0}))
+            sent_db.close_connection()
+            if sent:
+                replay_sent_db.insert_many(sent)
+        replay_sent_db.close_connection()
+
+    def extract(self):
+        extractor = CarsExtractor(REPLAY_LISTINGS, REPLAY_EXTRACTED_CARS, bot_helper=self.bot_helper,
+                                  subscriptions=self.subscriptions)
+        extractor.extract_cars()
+        extractor.close_connections()
+
+    def notify(self):
+        # A new prompt has to see every description: verdicts stored with the old one are not reused
+        started = time.perf_counter()
+        notifier = CarNotifier(REPLAY_EXTRACTED_CARS, REPLAY_SENT_LISTINGS, bot_helper=self.bot_helper,
+                               subscriptions=self.subscriptions, use_prefilter=self.use_prefilter,
+                               reuse_verdicts=not self.prompt_path)
+        notifier.send_delay = 0
+        if self.prompt_path:
+            with open(self.prompt_path, 'r') as prompt_file:
+                notifier.description_checker.system_prompt = prompt_file.read()
+        self.timings.append(("notifier setup", time.perf_counter() - started))
+
+        started = time.perf_counter()
+        notifier.search_for_cars()
+        elapsed = time.perf_counter() - started
+        self.timings.append(("description check", notifier.verdict_seconds))
+        self.timings.append(("notify", elapsed - notifier.verdict_seconds))
+        self.without_description = sum(1 for _, status in notifier.verdicts.values() if status == "No Description")
+
+        notifier.close_connections()
+
+    def run(self, snapshot_path=None):
+        listings = self.timed("load listings", self.load_listings, snapshot_path)
+        self.timed("prepare collections", self.prepare_collections, listings)
+        self.timed("extract", self.extract)
+        self.notify()
+        self.report()
+
+    def report(self):
+        print(f"\nMessages written to {self.bot_helper.output_path}:")
+        for chat_id, count in self.bot_helper.messages_per_chat.items():
+            print(f"  chat {chat_id}: {count} message(s)")
+        if self.without_description:
+            print(f"  {self.without_description} matched car(s) had no stored description and skipped "
+                  f"the description check (sent as \"No Description\").")
+
+        print("\nStage timings:")
+        for stage, seconds in self.timings:
+            print(f"  {stage:<20} {seconds:8.2f} s")
+        print(f"  {'total':<20} {sum(seconds for _, seconds in self.timings):8.2f} s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Dry run: re-evaluate stored listings without crawling or sending to Telegram.")
+    parser.add_argument('--snapshot', help="Parquet snapshot to replay (default: the latest one).")
+    parser.add_argument('--from-mongo', action='store_true',
+                        help="Replay the current listings collection instead of a snapshot.")
+    parser.add_argument('--config',
+                        help="Config file with the rules to try. Its results chat and cars replace "
+                             "all subscriptions for the replay (default: config.json and the subscriptions).")
+    parser.add_argument('--prompt',
+                        help="Text file with a system prompt to try for the description check. "
+                             "Stored verdicts are not reused.")
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help="Send every description to the LLM instead of deciding obvious ones locally.")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Ignore what was already sent, so every match is reported.")
+    parser.add_argument('--output', default='replay_output.txt', help="File the Telegram messages are written to.")
+    args = parser.parse_args()
+
+    subscriptions = None
+    if args.config:
+        try:
+            config = use_config_file(args.config)
+        except (OSError, ConfigError) as e:
+            logger.error(e)
+            raise SystemExit(1)
+        subscriptions = [subscription_from_config(config)]
+
+    snapshot_path = None
+    if not args.from_mongo:
+        snapshot_path = args.snapshot or latest_snapshot()
+        if not snapshot_path:
+            logger.error("No snapshot found, run snapshot_exporter.py or use --from-mongo.")
+            raise SystemExit(1)
+
+    Replay(args.output, args.fresh, args.prompt, subscriptions, not args.no_prefilter).run(snapshot_path)
@@ -0,0 +1,126 @@
+# snapshot_exporter.py
+
+import os
+import re
+import logging
+from dotenv import load_dotenv
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from helpers.dbHelper import DbHelper
+from helpers.telegramHelper import TelegramBotHelper
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Columns of every snapshot, in order
+SNAPSHOT_SCHEMA = pa.schema([
+    ("ID", pa.string()),
+    ("Title", pa.string()),
+    ("Make", pa.string()),
+    ("Year", pa.int16()),
+    ("Price", pa.float64()),
+    ("Mileage", pa.int64()),
+    ("Proximity", pa.int32()),
+    ("Product URL", pa.string()),
+    ("CrawledAt", pa.timestamp("s")),
+])
+
+
+def get_snapshot_dir():
+    """Root directory of the snapshots, partitioned as date=YYYY-MM-DD/."""
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.getenv('SNAPSHOT_DIR', os.path.join(project_dir, 'snapshots'))
+
+
+def parse_title(title):
+    """Split a listing title like '2012 Hyundai Elantra GL' into (year, make)."""
+    if not title:
+        return None, None
+    year = None
+    words = title.split()
+    match = re.search(r'\b((?:19|20)\d{2})\b\s*(\S+)?', title)
+    if match:
+        year = int(match.group(1))
+        if match.group(2):
+            return year, match.group(2).lower()
+        # The year is the last word ("Hyundai Elantra 2012"), the make comes first
+        words = [word for word in words if word != match.group(1)]
+    return year, words[0].lower() if words else None
+
+
+class SnapshotExporter:
+    """Writes the crawled listings as a compressed Parquet snapshot, one partition per day."""
+
+    def __init__(self):
+        self.db_helper = DbHelper(os.getenv('DATABASE_NAME'), "listings")
+        self.bot_helper = TelegramBotHelper()
+        self.snapshot_dir = get_snapshot_dir()
+
+    def build_table(self, listings, crawled_at):
+        """Convert listing documents into an Arrow table with the snapshot schema."""
+        columns = {name: [] for name in SNAPSHOT_SCHEMA.names}
+        for listing in listings:
+            year, make = parse_title(listing.get('Title'))
+            columns["ID"].append(listing.get('ID'))
+            columns["Title"].append(listing.get('Title'))
+            columns["Make"].append(make)
+            columns["Year"].append(year)
+            columns["Price"].append(listing.get('Price'))
+            columns["Mileage"].append(listing.get('Mileage'))
+            columns["Proximity"].append(listing.get('Proximity'))
+            columns["Product URL"].append(listing.get('Product URL'))
+            columns["CrawledAt"].append(crawled_at)
+        return pa.table(columns, schema=SNAPSHOT_SCHEMA)
+
+    def snapshot_path(self, crawled_at):
+        """Path of the snapshot of the crawl finished at `crawled_at`, under date=YYYY-MM-DD/."""
+        partition_dir = os.path.join(self.snapshot_dir, f"date={crawled_at.strftime('%Y-%m-%d')}")
+        return os.path.join(partition_dir, f"listings-{crawled_at.strftime('%H%M%S')}.parquet")
+
+    def write_snapshot(self, table, crawled_at):
+        """Write the table and return the file path."""
+        path = self.snapshot_path(crawled_at)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, path, compression='zstd')
+        return path
+
+    def export(self):
+        listings = list(self.db_helper.db.find({}, {"_id": 0}))
+        if not listings:
+            logger.warning("No listings to export.")
+            return None
+
+        # The spider stamps the listings when it replaces them. Without a stamp, or with
+        # one that was already exported, the last crawl did not finish and the listings are stale.
+        crawled_at = max((listing['CrawledAt'] for listing in listings if listing.get('CrawledAt')), default=None)
+        if crawled_at is None:
+            logger.warning("Listings have no crawl time, not exporting.")
+            return None
+        if os.path.exists(self.snapshot_path(crawled_at)):
+            message = f"Listings were not refreshed since the crawl of {crawled_at}, no snapshot exported."
+            logger.warning(message)
+            self.bot_helper.send_log(message)
+            return None
+
+        table = self.build_table(listings, crawled_at)
+        path = self.write_snapshot(table, crawled_at)
+
+        message = f"Snapshot exported: {table.num_rows} listings to {path}"
+        logger.info(message)
+        self.bot_helper.send_log(message)
+        return path
+
+    def close_connections(self):
+        """Close database connections."""
+        self.db_helper.close_connection()
+
+
+if __name__ == '__main__':
+    exporter = SnapshotExporter()
+    exporter.export()
+    exporter.close_connections()
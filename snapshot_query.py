@@ -0,0 +1,138 @@
+# snapshot_query.py
+
+import argparse
+import glob
+import logging
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from snapshot_exporter import get_snapshot_dir
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def load_snapshots(snapshot_dir, since=None, until=None, make=None):
+    """Load the snapshots between two dates (YYYY-MM-DD, inclusive) as one Arrow table."""
+    partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(snapshot_dir, format="parquet", partitioning=partitioning)
+
+    # Filters are pushed down, so partitions outside the range are never read
+    condition = None
+    filters = []
+    if since:
+        filters.append(ds.field("date") >= since)
+    if until:
+        filters.append(ds.field("date") <= until)
+    if make:
+        filters.append(ds.field("Make") == make.lower())
+    for expression in filters:
+        condition = expression if condition is None else condition & expression
+
+    return dataset.to_table(filter=condition)
+
+
+def latest_listings(table):
+    """One row per listing ID: the one from the latest snapshot the listing appears in."""
+    columns = [column for column in table.column_names if column != "ID"]
+    latest = table.sort_by("CrawledAt").group_by("ID", use_threads=False).aggregate(
+        [(column, "last") for column in columns]
+    )
+    return latest.rename_columns([name[:-len("_last")] if name.endswith("_last") else name
+                                  for name in latest.column_names])
+
+
+def median_price(table, by):
+    """
+    Median, mean and count of prices grouped by the given columns. Each listing counts
+    once, with its price in the latest snapshot it appears in.
+    """
+    table = latest_listings(table)
+    table = table.filter(pc.is_valid(table["Price"]))
+    return table.group_by(by).aggregate([
+        ("Price", "approximate_median"),
+        ("Price", "mean"),
+        ("Price", "count"),
+    ]).sort_by([(column, "ascending") for column in by])
+
+
+def days_on_market(table, by, sold_only=False):
+    """
+    Median days between the first and last snapshot a listing appears in, grouped by
+    the given columns. With sold_only, listings still present in the latest snapshot
+    are left out.
+    """
+    per_listing = table.group_by(["ID"] + by).aggregate([
+        ("CrawledAt", "min"),
+        ("CrawledAt", "max"),
+    ])
+    # Parquet reads second timestamps back as milliseconds, so normalise the unit first
+    duration = pc.cast(pc.subtract(per_listing["CrawledAt_max"], per_listing["CrawledAt_min"]), pa.duration("s"))
+    seconds = pc.cast(duration, pa.int64())
+    per_listing = per_listing.append_column("Days", pc.divide(pc.cast(seconds, pa.float64()), SECONDS_PER_DAY))
+
+    if sold_only:
+        latest = pc.max(table["CrawledAt"])
+        per_listing = per_listing.filter(pc.less(per_listing["CrawledAt_max"], latest))
+
+    return per_listing.group_by(by).aggregate([
+        ("Days", "approximate_median"),
+        ("Days", "mean"),
+        ("ID", "count"),
+    ]).sort_by([(column, "ascending") for column in by])
+
+
+def snapshot_counts(table):
+    """Number of listings per snapshot."""
+    return table.group_by(["date", "CrawledAt"]).aggregate([("ID", "count")]).sort_by("CrawledAt")
+
+
+def print_table(table):
+    """Print an Arrow table as aligned text columns."""
+    rows = [[column for column in table.column_names]]
+    for row in table.to_pylist():
+        rows.append([f"{value:.1f}" if isinstance(value, float) else str(value) for value in row.values()])
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(table.column_names))]
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Aggregate queries over the exported listing snapshots.")
+    parser.add_argument('--dir', default=get_snapshot_dir(), help="Snapshot root directory.")
+    parser.add_argument('--since', help="First snapshot date to include (YYYY-MM-DD).")
+    parser.add_argument('--until', help="Last snapshot date to include (YYYY-MM-DD).")
+    parser.add_argument('--make', help="Only include listings of this make.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    price_parser = subparsers.add_parser('median-price', help="Median price grouped by columns.")
+    price_parser.add_argument('--by', nargs='+', default=["Make", "Year"], help="Columns to group by.")
+
+    market_parser = subparsers.add_parser('days-on-market', help="Median days a listing stays online.")
+    market_parser.add_argument('--by', nargs='+', default=["Make"], help="Columns to group by.")
+    market_parser.add_argument('--sold-only', action='store_true',
+                               help="Only count listings that disappeared before the latest snapshot.")
+
+    subparsers.add_parser('snapshots', help="Number of listings per snapshot.")
+
+    args = parser.parse_args()
+    if not glob.glob(os.path.join(args.dir, "date=*", "*.parquet")):
+        logger.error(f"No snapshots found in {args.dir}, run snapshot_exporter.py first.")
+        raise SystemExit(1)
+
+    snapshots = load_snapshots(args.dir, args.since, args.until, args.make)
+    logger.info(f"Loaded {snapshots.num_rows} rows from {args.dir}")
+
+    if args.command == 'median-price':
+        print_table(median_price(snapshots, args.by))
+    elif args.command == 'days-on-market':
+        print_table(days_on_market(snapshots, args.by, args.sold_only))
+    elif args.command == 'snapshots':
+        print_table(snapshot_counts(snapshots))
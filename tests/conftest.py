@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# The scripts and helpers are imported from the project root, as when they are run
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def valid_config():
+    """Content of a valid config.json, fresh for every test."""
+    return {
+        "cars": [
+            {
+                "max_price": 4000,
+                "max_mileage": 250000,
+                "max_proximity": 50,
+                "title_contains": "hyundai",
+                "min_year": 2011,
+                "use_description_check": True
+            }
+        ],
+        "start_url": "https://www.autotrader.ca/cars/on/mississauga/?rcp=100&rcs=0&srt=9",
+        "telegram_chat_id_logging": "-1",
+        "telegram_chat_id_results": -2
+    }
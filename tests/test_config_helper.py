@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from helpers import configHelper
+from helpers.configHelper import CarSearch, ConfigError, parse_car_searches, parse_config
+
+def test_parse_config(valid_config):
+    config = parse_config(valid_config)
+    assert config.cars == (CarSearch(4000, 250000, 50, "hyundai", 2011, True),)
+    assert config.telegram_chat_id_results == "-2"
+
+
+def test_parse_car_searches_defaults():
+    cars = parse_car_searches([{"max_price": 1, "max_mileage": 2, "max_proximity": 3, "title_contains": "kia"}])
+    assert cars[0].as_dict() == {
+        "max_price": 1, "max_mileage": 2, "max_proximity": 3, "title_contains": "kia",
+        "min_year": None, "use_description_check": False,
+    }
+
+
+def test_parse_config_reports_every_error(valid_config):
+    data = valid_config
+    data["cars"].append(dict(data["cars"][0], max_prise=5))
+    data["cars"][0]["max_price"] = "4k"
+    data["cars"][0]["title_contains"] = "("
+    del data["start_url"]
+
+    with pytest.raises(ConfigError) as error:
+        parse_config(data)
+
+    message = str(error.value)
+    assert "cars[0].max_price: expected a number, got '4k'" in message
+    assert "cars[0].title_contains: invalid regular expression" in message
+    assert "cars[1]: unknown field 'max_prise'" in message
+    assert "start_url" in message
+
+
+@pytest.mark.parametrize("cars", [None, [], [True], [{"max_price": True}]])
+def test_parse_car_searches_rejects(cars):
+    with pytest.raises(ConfigError):
+        parse_car_searches(cars)
+
+
+def test_config_is_loaded_once(tmp_path, monkeypatch, valid_config):
+    monkeypatch.setattr(configHelper, '_config', None)
+    monkeypatch.setattr(configHelper, '_config_path', None)
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(valid_config))
+
+    first = configHelper.use_config_file(str(path))
+    path.write_text("{not json")
+    assert configHelper.get_config() is first
+
+
+def test_invalid_config_file_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(configHelper, '_config', None)
+    monkeypatch.setattr(configHelper, '_config_path', None)
+    path = tmp_path / "config.json"
+    path.write_text("{not json")
+    with pytest.raises(ConfigError):
+        configHelper.use_config_file(str(path))
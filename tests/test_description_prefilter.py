@@ -0,0 +1,116 @@
+import pytest
+
+from helpers.descriptionPrefilter import DescriptionPrefilter
+
+
+@pytest.fixture
+def prefilter():
+    return DescriptionPrefilter()
+
+
+@pytest.mark.parametrize("description", [
+    "Engine blown, sold as-is.",
+    "Does not start. Parts only.",
+    "Sold as is condition, needs a new transmission.",
+])
+def test_plainly_bad_descriptions_are_decided_locally(prefilter, description):
+    assert prefilter.classify(description) is False
+
+
+@pytest.mark.parametrize("description", [
+    "Safety certified, no accidents. OMVIC dealer.",
+    "Certified pre-owned, clean Carfax, warranty available.",
+])
+def test_plainly_good_descriptions_are_decided_locally(prefilter, description):
+    assert prefilter.classify(description) is True
+
+
+@pytest.mark.parametrize("description", [
+    "Not safety certified. Accident free.",
+    "Vehicle is not certified, no accidents, sold without safety.",
+    "No warranty. Needs brakes and safety. Accident free, one owner.",
+    "Doesn't come certified. Clean Carfax, one owner, warranty.",
+])
+def test_negated_good_phrases_are_not_decided_good(prefilter, description):
+    assert prefilter.classify(description) is not True
+
+
+def test_good_needs_a_strong_phrase(prefilter):
+    # Accident history and dealer boilerplate say nothing about roadworthiness
+    description = "Clean Carfax, accident free, one owner, warranty available."
+    assert prefilter.score(description)[1] >= 3
+    assert prefilter.classify(description) is None
+
+
+def test_certified_is_not_counted_twice(prefilter):
+    assert prefilter.score("Safety certified.") == (0, 2)
+
+
+def test_as_is_in_ordinary_prose_is_not_bad(prefilter):
+    assert prefilter.score("Reliable, as is the case with all Toyotas.") == (0, 0)
+
+
+def test_slipping_transmission_is_bad(prefilter):
+    assert prefilter.score("Transmission slipping.")[0] == 2
+
+
+@pytest.mark.parametrize("description", [
+    "Blown head gasket repaired last month, new timing belt.",
+    "Was a project car, fully restored.",
+    "Previously had transmission issues, replaced under warranty.",
+])
+def test_repaired_problems_are_not_decided_bad(prefilter, description):
+    assert prefilter.classify(description) is not False
+
+
+def test_bad_phrase_in_a_good_description_is_not_decided_good(prefilter):
+    description = "Ready to drive. Safety certificate included. Has a small oil leak, head gasket needs replacing."
+    assert prefilter.classify(description) is not True
+
+
+def test_one_ambiguous_bad_phrase_goes_to_the_llm(prefilter):
+    assert prefilter.classify("Engine blown.") is None
+    assert prefilter.classify("Engine blown, needs a new transmission.") is False
+
+
+def test_negated_bad_phrases_are_ignored(prefilter):
+    assert prefilter.classify("Runs fine, no rust holes, no check engine light.") is None
+
+
+def test_avoided_ratio(prefilter):
+    prefilter.classify("Engine blown, sold as-is.")
+    prefilter.classify("Nice car.")
+    assert prefilter.avoided_ratio() == 0.5
+    assert "1 of 2" in prefilter.report()
+
+
+def training_data(noise=False):
+    """60 descriptions the keyword scorer cannot decide, with their LLM verdicts."""
+    descriptions = [f"Lovely smooth quiet ride, garage kept, car {i}." for i in range(30)]
+    descriptions += [f"Loud grinding noise, smoke from the exhaust, car {i}." for i in range(30)]
+    verdicts = [True] * 30 + [False] * 30
+    if noise:
+        # Verdicts the text does not explain: held-out predictions cannot agree with them
+        verdicts = [i % 2 == 0 for i in range(60)]
+    return descriptions, verdicts
+
+
+def test_model_is_used_when_it_agrees_with_the_llm():
+    pytest.importorskip("sklearn")
+    prefilter = DescriptionPrefilter()
+    prefilter.train(*training_data())
+
+    assert prefilter.model is not None
+    assert prefilter.model_agreement >= prefilter.min_agreement
+    assert prefilter.classify("Lovely smooth quiet ride, garage kept.") is True
+    assert "held-out agreement" in prefilter.report()
+
+
+def test_model_is_not_used_when_it_disagrees_with_the_llm():
+    pytest.importorskip("sklearn")
+    prefilter = DescriptionPrefilter(model_confidence=0.5)
+    prefilter.train(*training_data(noise=True))
+
+    assert prefilter.model is None
+    assert prefilter.model_agreement < prefilter.min_agreement
+    assert "model: not used" in prefilter.report()
@@ -0,0 +1,55 @@
+import json
+
+import pipeline
+
+# Writes the config file it was given to a file named after the script
+RECORD_CONFIG = """
+import os, shutil, sys
+shutil.copy(os.environ['CARS_CONFIG_PATH'], sys.argv[0] + '.config')
+"""
+
+
+def test_stages_use_the_config_frozen_at_start(tmp_path, monkeypatch, valid_config):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(valid_config))
+    monkeypatch.setattr(pipeline, 'DEFAULT_CONFIG_PATH', str(config_path))
+
+    first = tmp_path / "first.py"
+    # The first stage breaks config.json, the second must still get the valid copy
+    first.write_text(RECORD_CONFIG + f"open({str(config_path)!r}, 'w').write('{{broken')\n")
+    second = tmp_path / "second.py"
+    second.write_text(RECORD_CONFIG)
+
+    assert pipeline.run_pipeline([str(first), str(second)])
+    assert json.loads((tmp_path / "second.py.config").read_text()) == valid_config
+
+    # The next run sees the broken file and does not start
+    assert not pipeline.run_pipeline([str(first)])
+
+
+def test_failed_stage_stops_the_run_without_exiting(tmp_path, monkeypatch, valid_config):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(valid_config))
+    monkeypatch.setattr(pipeline, 'DEFAULT_CONFIG_PATH', str(config_path))
+
+    failing = tmp_path / "failing.py"
+    failing.write_text("raise SystemExit(1)\n")
+    never_run = tmp_path / "never_run.py"
+    never_run.write_text(RECORD_CONFIG)
+
+    assert not pipeline.run_pipeline([str(failing), str(never_run)])
+    assert not (tmp_path / "never_run.py.config").exists()
+
+
+def test_failed_snapshot_export_does_not_stop_the_run(tmp_path, monkeypatch, valid_config):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(valid_config))
+    monkeypatch.setattr(pipeline, 'DEFAULT_CONFIG_PATH', str(config_path))
+
+    exporter = tmp_path / "snapshot_exporter.py"
+    exporter.write_text("raise SystemExit(1)\n")
+    notifier = tmp_path / "notifier.py"
+    notifier.write_text(RECORD_CONFIG)
+
+    assert pipeline.run_pipeline([str(exporter), str(notifier)])
+    assert (tmp_path / "notifier.py.config").exists()
@@ -0,0 +1,113 @@
+from unittest import mock
+
+import pytest
+
+import replay
+from car_notifier import CarNotifier
+from helpers.configHelper import parse_config
+from helpers.descriptionPrefilter import DescriptionPrefilter
+from helpers.subscriptionHelper import subscription_from_config, union_car_configs
+from helpers.telegramHelper import FileBotHelper
+
+OBVIOUSLY_BAD = {"ID": "a", "Description": "Engine blown, sold as-is."}
+
+
+@pytest.fixture
+def notifier():
+    """CarNotifier without database connections."""
+    notifier = CarNotifier.__new__(CarNotifier)
+    notifier.sent_db = mock.MagicMock()
+    notifier.sent_db.db.find_one.return_value = {"ID": "a", "Verdict": "Good", "VerdictSource": "llm"}
+    notifier.description_checker = mock.MagicMock()
+    notifier.description_checker.check_the_car.return_value = True
+    notifier.prefilter = DescriptionPrefilter()
+    notifier.reuse_verdicts = True
+    notifier.verdicts = {}
+    notifier.verdict_sources = {}
+    notifier.verdict_seconds = 0.0
+    return notifier
+
+
+def test_stored_verdicts_are_reused(notifier):
+    assert notifier._get_verdict(OBVIOUSLY_BAD) == ("✅ Good", "Good")
+    notifier.description_checker.check_the_car.assert_not_called()
+
+
+def test_prefilter_verdicts_are_not_reused(notifier):
+    notifier._get_verdict(OBVIOUSLY_BAD)
+    query = notifier.sent_db.db.find_one.call_args[0][0]
+    assert query["VerdictSource"] == {"$ne": "prefilter"}
+
+
+def test_stored_verdicts_can_be_ignored(notifier):
+    notifier.reuse_verdicts = False
+    assert notifier._get_verdict(OBVIOUSLY_BAD)[1] == "Bad"
+    notifier.sent_db.db.find_one.assert_not_called()
+    assert notifier.verdict_sources["a"] == "prefilter"
+
+
+def test_without_prefilter_every_description_goes_to_the_llm(notifier):
+    notifier.reuse_verdicts = False
+    notifier.prefilter = None
+    assert notifier._get_verdict(OBVIOUSLY_BAD)[1] == "Good"
+    notifier.description_checker.check_the_car.assert_called_once_with(OBVIOUSLY_BAD["Description"])
+    assert notifier.verdict_sources["a"] == "llm"
+    assert notifier.verdict_seconds > 0
+
+    # Computed once per run
+    notifier._get_verdict(OBVIOUSLY_BAD)
+    assert notifier.description_checker.check_the_car.call_count == 1
+
+
+def test_subscription_from_config(valid_config):
+    subscription = subscription_from_config(parse_config(valid_config))
+    assert subscription["chat_id"] == "-2"
+    assert subscription["cars"][0]["title_contains"] == "hyundai"
+
+
+def test_union_car_configs_drops_duplicates(valid_config):
+    hyundai = valid_config["cars"][0]
+    mazda = dict(hyundai, title_contains="mazda")
+    subscriptions = [{"chat_id": "1", "cars": [hyundai]}, {"chat_id": "2", "cars": [dict(hyundai), mazda]}]
+    assert union_car_configs(subscriptions) == [hyundai, mazda]
+
+
+def test_config_subscriptions_replace_stored_ones(tmp_path, monkeypatch, valid_config):
+    subscriptions = [subscription_from_config(parse_config(valid_config))]
+    extractor = mock.MagicMock()
+    notifier = mock.MagicMock(verdict_seconds=0.0)
+    monkeypatch.setattr(replay, 'CarsExtractor', extractor)
+    monkeypatch.setattr(replay, 'CarNotifier', notifier)
+
+    dry_run = replay.Replay(str(tmp_path / "out.txt"), prompt_path=None, subscriptions=subscriptions)
+    dry_run.extract()
+    dry_run.notify()
+
+    assert extractor.call_args.kwargs["subscriptions"] is subscriptions
+    assert notifier.call_args.kwargs["subscriptions"] is subscriptions
+    assert notifier.call_args.kwargs["reuse_verdicts"] is True
+
+
+def test_report_counts_cars_without_description(tmp_path, monkeypatch, capsys):
+    notifier = mock.MagicMock(verdict_seconds=0.0, verdicts={
+        "a": ("✅ Good", "Good"),
+        "b": ("⚠️ No Description", "No Description"),
+    })
+    monkeypatch.setattr(replay, 'CarNotifier', mock.MagicMock(return_value=notifier))
+
+    dry_run = replay.Replay(str(tmp_path / "out.txt"))
+    dry_run.notify()
+    dry_run.report()
+
+    assert dry_run.without_description == 1
+    assert "1 matched car(s) had no stored description" in capsys.readouterr().out
+
+
+def test_file_bot_helper_writes_messages(tmp_path):
+    path = tmp_path / "out.txt"
+    bot_helper = FileBotHelper(str(path))
+    bot_helper.send_message("-1", "hello")
+    bot_helper.send_message("-1", "again")
+
+    assert bot_helper.messages_per_chat == {"-1": 2}
+    assert "--- chat -1 ---\nhello" in path.read_text()
@@ -0,0 +1,83 @@
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from snapshot_exporter import SnapshotExporter, parse_title
+from snapshot_query import days_on_market, load_snapshots, median_price
+
+FIRST_CRAWL = datetime(2026, 10, 1, 9, 0, 0)
+SECOND_CRAWL = datetime(2026, 10, 5, 9, 0, 0)
+
+LISTINGS = [
+    {'ID': 'a', 'Title': '2012 Hyundai Elantra GL', 'Price': 3000.0, 'Mileage': 200000,
+     'Proximity': 10, 'Product URL': 'https://example.com/a'},
+    {'ID': 'b', 'Title': '2015 Mazda 3', 'Price': 4000.0, 'Mileage': None,
+     'Proximity': 20, 'Product URL': 'https://example.com/b'},
+]
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    exporter = SnapshotExporter.__new__(SnapshotExporter)
+    exporter.snapshot_dir = str(tmp_path)
+    exporter.db_helper = mock.MagicMock()
+    exporter.bot_helper = mock.MagicMock()
+    return exporter
+
+
+@pytest.fixture
+def snapshots(exporter):
+    """Hyundai 'a' is in both crawls and gets cheaper, Mazda 'b' is only in the first."""
+    exporter.write_snapshot(exporter.build_table(LISTINGS, FIRST_CRAWL), FIRST_CRAWL)
+    cheaper = [dict(LISTINGS[0], Price=2500.0)]
+    exporter.write_snapshot(exporter.build_table(cheaper, SECOND_CRAWL), SECOND_CRAWL)
+    return load_snapshots(exporter.snapshot_dir)
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("2012 Hyundai Elantra GL", (2012, "hyundai")),
+    ("Hyundai Elantra 2012", (2012, "hyundai")),
+    ("Toyota Corolla", (None, "toyota")),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_title(title, expected):
+    assert parse_title(title) == expected
+
+
+def test_median_price_counts_each_listing_once(snapshots):
+    rows = {row['Make']: row for row in median_price(snapshots, ["Make"]).to_pylist()}
+    assert rows['hyundai']['Price_count'] == 1
+    # The price of the latest snapshot the listing appears in
+    assert rows['hyundai']['Price_approximate_median'] == 2500.0
+    assert rows['mazda']['Price_count'] == 1
+
+
+def test_days_on_market(snapshots):
+    rows = {row['Make']: row for row in days_on_market(snapshots, ["Make"]).to_pylist()}
+    assert rows['hyundai']['Days_mean'] == 4.0
+    assert rows['mazda']['Days_mean'] == 0.0
+
+    sold = days_on_market(snapshots, ["Make"], sold_only=True).to_pylist()
+    assert [row['Make'] for row in sold] == ['mazda']
+
+
+def test_load_snapshots_filters_dates_and_make(snapshots, exporter):
+    assert load_snapshots(exporter.snapshot_dir, since="2026-10-02").num_rows == 1
+    assert load_snapshots(exporter.snapshot_dir, make="Mazda").num_rows == 1
+
+
+def test_export_writes_a_fresh_crawl_once(exporter):
+    exporter.db_helper.db.find.return_value = [dict(listing, CrawledAt=FIRST_CRAWL) for listing in LISTINGS]
+
+    path = exporter.export()
+    assert path == exporter.snapshot_path(FIRST_CRAWL)
+
+    # Same listings again: the crawl did not replace them, nothing is exported
+    assert exporter.export() is None
+
+
+def test_export_skips_listings_without_crawl_time(exporter):
+    exporter.db_helper.db.find.return_value = list(LISTINGS)
+    assert exporter.export() is None
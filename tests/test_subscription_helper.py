@@ -0,0 +1,95 @@
+from unittest import mock
+
+import pytest
+
+import car_extractor
+import car_notifier
+from helpers.subscriptionHelper import car_matches_config
+
+CAR_CONFIG = {
+    "max_price": 4000,
+    "max_mileage": 250000,
+    "max_proximity": 50,
+    "title_contains": "hyundai",
+    "min_year": 2011,
+    "use_description_check": True,
+}
+
+CAR = {"ID": "a", "Title": "2012 Hyundai Elantra", "Price": 4000.0, "Mileage": 250000, "Proximity": 50}
+
+
+# Expected results follow the Mongo query the extractor runs:
+# Price $lte, Mileage $lte or null, Proximity $lte, Title case-insensitive $regex
+@pytest.mark.parametrize("changes, year, expected", [
+    ({}, 2012, True),
+    ({"Price": 4000.01}, 2012, False),
+    ({"Price": None}, 2012, False),
+    ({"Mileage": 250001}, 2012, False),
+    ({"Mileage": None}, 2012, True),
+    ({"Proximity": 51}, 2012, False),
+    ({"Proximity": None}, 2012, False),
+    ({"Title": "2012 HYUNDAI Elantra"}, 2012, True),
+    ({"Title": "2012 Kia Rio"}, 2012, False),
+    ({"Title": None}, None, False),
+    ({}, 2010, False),
+    ({"Title": "Hyundai Elantra"}, None, True),
+])
+def test_car_matches_config(changes, year, expected):
+    assert car_matches_config(dict(CAR, **changes), CAR_CONFIG, year) is expected
+
+
+def test_missing_fields_follow_mongo():
+    car = {"ID": "a", "Title": "2012 Hyundai Elantra", "Price": 100.0, "Proximity": 1}
+    # A missing Mileage matches {"Mileage": None}
+    assert car_matches_config(car, CAR_CONFIG, 2012) is True
+    # A missing Title never matches $regex, even with a pattern matching ''
+    assert car_matches_config({"Price": 100.0, "Proximity": 1}, dict(CAR_CONFIG, title_contains=".*"), None) is False
+
+
+def test_regex_and_disabled_year_filter():
+    config = dict(CAR_CONFIG, title_contains="hyundai|mazda", min_year=None)
+    assert car_matches_config(dict(CAR, Title="1999 Mazda Protege"), config, 1999) is True
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Replace the database and API clients used by the extractor and the notifier."""
+    subscription_helper = mock.MagicMock()
+    for module in (car_extractor, car_notifier):
+        monkeypatch.setattr(module, 'DbHelper', mock.MagicMock())
+        monkeypatch.setattr(module, 'SubscriptionHelper', subscription_helper)
+    monkeypatch.setattr(car_notifier, 'ChatGptDescriptionCheck', mock.MagicMock())
+    monkeypatch.setattr(car_notifier, 'get_config', mock.MagicMock())
+    return subscription_helper
+
+
+def test_given_subscriptions_do_not_open_the_subscriptions_collection(offline):
+    subscriptions = [{"chat_id": "1", "cars": [CAR_CONFIG]}]
+    car_extractor.CarsExtractor(bot_helper=mock.MagicMock(), subscriptions=subscriptions)
+    car_notifier.CarNotifier(bot_helper=mock.MagicMock(), subscriptions=subscriptions, use_prefilter=False)
+    offline.assert_not_called()
+
+
+def test_empty_subscriptions_are_not_replaced(offline):
+    notifier = car_notifier.CarNotifier(bot_helper=mock.MagicMock(), subscriptions=[], use_prefilter=False)
+    assert notifier.subscriptions == []
+    offline.assert_not_called()
+
+
+def test_stored_subscriptions_are_loaded_and_closed(offline):
+    offline.return_value.get_subscriptions.return_value = [{"chat_id": "1", "cars": [CAR_CONFIG]}]
+    extractor = car_extractor.CarsExtractor(bot_helper=mock.MagicMock())
+    assert extractor.cars_config == [CAR_CONFIG]
+    offline.return_value.close_connection.assert_called_once()
+
+
+def test_notifier_skips_cars_without_title(offline):
+    notifier = car_notifier.CarNotifier(bot_helper=mock.MagicMock(), subscriptions=[], use_prefilter=False)
+    notifier.send_delay = 0
+    notifier.sent_db.db.find_one.return_value = None
+    subscription = {"chat_id": "1", "cars": [dict(CAR_CONFIG, use_description_check=False)]}
+
+    notifier.notify_subscriber(subscription, [dict(CAR, Title=None), dict(CAR, ID="b", **{"Product URL": "https://example.com/b"})])
+
+    sent = [record.args[0]["ID"] for record in notifier.sent_db.db.insert_one.call_args_list]
+    assert sent == ["b"]